@@ -1,33 +1,172 @@
-# conftest.py
-import pytest
-from playwright.sync_api import sync_playwright, Page, Browser
-from typing import Tuple
-
-
-@pytest.fixture
-def browser_context() -> Tuple[sync_playwright, Browser]:
-    """
-    Returns the playwright instance and browser that can be used to
-    create contexts and pages or switch between headless/headed modes.
-    """
-    playwright = sync_playwright().start()
-    browser = playwright.chromium.launch(headless=False)  # default is headed
-    try:
-        yield (playwright, browser)
-    finally:
-        browser.close()
-        playwright.stop()
-
-
-@pytest.fixture
-def page(browser_context):
-    """
-    The standard page fixture that returns a ready-to-use page.
-    """
-    playwright, browser = browser_context
-    context = browser.new_context()
-    page = context.new_page()
-    try:
-        yield page
-    finally:
-        context.close()
+# conftest.py
+"""
+Playwright fixtures shared by the browser tests.
+
+Browser binaries are looked up in PLAYWRIGHT_BROWSERS_PATH. Point it at a
+persistent location (e.g. ``$HOME/.cache/ms-playwright``) and cache that
+directory in CI, keyed on the Playwright version, so ``playwright install``
+does not download Chromium again on every fresh environment.
+"""
+
+import gc
+import os
+
+import pytest
+from playwright.sync_api import (
+    sync_playwright,
+    Playwright,
+    Page,
+    Browser,
+    BrowserContext,
+    Route,
+)
+
+WEBTABLES_URL = "https://demoqa.com/webtables"
+
+# Assertions only read DOM text, so rendered assets and trackers are skipped
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+BLOCKED_URL_PARTS = ("doubleclick", "google-analytics", "googlesyndication")
+
+# Storage access throws on about:blank and opaque origins, hence the guard
+CLEAR_STORAGE_JS = """() => {
+    try {
+        localStorage.clear();
+        sessionStorage.clear();
+    } catch (e) {}
+}"""
+
+
+def block_non_essential(route: Route) -> None:
+    """
+    Route handler that aborts requests the tests do not need.
+
+    :param route: The intercepted Playwright route
+    """
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        part in request.url for part in BLOCKED_URL_PARTS
+    ):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def pytest_addoption(parser) -> None:
+    """
+    Registers the --headed option. Tests run headless by default; pass
+    --headed (or set HEADED=1) to watch the browser.
+    """
+    parser.addoption(
+        "--headed",
+        action="store_true",
+        default=os.getenv("HEADED") == "1",
+        help="Run the browser in headed mode",
+    )
+
+
+@pytest.fixture(scope="session")
+def playwright_instance() -> Playwright:
+    """
+    Returns the playwright instance, started once for the whole test session.
+    """
+    with sync_playwright() as playwright:
+        yield playwright
+    # Reclaim Playwright proxy objects left behind by finished tests
+    gc.collect()
+
+
+@pytest.fixture(scope="session")
+def browser(playwright_instance, pytestconfig) -> Browser:
+    """
+    Returns a browser shared by all tests in the session. Tests that need
+    their own contexts or pages can create them from it directly.
+
+    Under pytest-xdist (``pytest -n auto``) every worker is its own session,
+    so each worker launches exactly one browser and runs its tests in
+    separate contexts.
+    """
+    headed = pytestconfig.getoption("--headed")
+    with playwright_instance.chromium.launch(headless=not headed) as browser:
+        yield browser
+
+
+def new_context(browser: Browser) -> BrowserContext:
+    """
+    Create a browser context with non-essential requests blocked.
+
+    :param browser: The browser to create the context in
+    :return: A new browser context
+    """
+    context = browser.new_context()
+    context.route("**/*", block_non_essential)
+    return context
+
+
+def reset_and_close(page: Page) -> None:
+    """
+    Clear its context's cookies and the page's local and session storage,
+    then close it. Storage is only cleared for the origin the page is on,
+    and only if the test left the page open.
+
+    :param page: The page to reset and close
+    """
+    try:
+        if not page.is_closed():
+            page.evaluate(CLEAR_STORAGE_JS)
+    finally:
+        page.context.clear_cookies()
+        page.close()
+
+
+@pytest.fixture(scope="session")
+def shared_context(browser, request) -> BrowserContext:
+    """
+    A context reused by every test in the session. The page fixture resets
+    its cookies and storage between tests instead of recreating it, and
+    keeping it open keeps connections to the same origin alive.
+    """
+    context = new_context(browser)
+    request.addfinalizer(context.close)
+    return context
+
+
+@pytest.fixture
+def fresh_context(browser, request) -> BrowserContext:
+    """
+    A brand-new context for tests that need full isolation, e.g. ones that
+    depend on cache or permissions state the page reset does not cover.
+    """
+    context = new_context(browser)
+    request.addfinalizer(context.close)
+    return context
+
+
+@pytest.fixture
+def page(shared_context, request) -> Page:
+    """
+    The standard page fixture that returns a ready-to-use page in the
+    shared context. After each test the context's cookies and the local
+    and session storage of the page's final origin are cleared. Storage of
+    other origins, IndexedDB, caches and service workers are not reset, so
+    tests that depend on those should use fresh_context instead.
+    """
+    page = shared_context.new_page()
+    request.addfinalizer(lambda: reset_and_close(page))
+    return page
+
+
+@pytest.fixture(scope="module")
+def webtables_page(browser, request) -> Page:
+    """
+    A web tables page loaded once and shared by every test in the module.
+    Only use it from read-only tests; tests that add or edit records should
+    take the per-test page fixture instead.
+
+    The page lives in its own context, so the per-test page reset does not
+    clear its cookies or storage partway through the module.
+    """
+    context = new_context(browser)
+    request.addfinalizer(context.close)
+    page = context.new_page()
+    page.goto(WEBTABLES_URL)
+    return page
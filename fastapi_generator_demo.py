@@ -8,16 +8,19 @@ No page refreshes, true real-time streaming, and clean separation of concerns.
 """
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import asyncio
-import json
+import hashlib
 import random
+import time
 import uuid
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import AsyncGenerator, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import AsyncGenerator, Deque, Dict, Any, List, Optional, Tuple, Union
+from dataclasses import dataclass
+import msgspec
 
 app = FastAPI(title="Order Processing System - FastAPI Demo")
 
@@ -27,8 +30,89 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Setup templates
 templates = Jinja2Templates(directory="templates")
 
+# The dashboard page has no per-request content, so render it once at startup
+HOMEPAGE_HTML = templates.get_template("index.html").render().encode("utf-8")
+HOMEPAGE_ETAG = f'"{hashlib.md5(HOMEPAGE_HTML).hexdigest()}"'
+# no-cache still lets browsers store the page, but they revalidate with the ETag
+HOMEPAGE_CACHE_HEADERS = {"etag": HOMEPAGE_ETAG, "cache-control": "no-cache"}
+HOMEPAGE_HEADERS = {**HOMEPAGE_CACHE_HEADERS, "content-length": str(len(HOMEPAGE_HTML))}
+
+# JSON envelopes for order messages, so only the order itself is serialized per send
+ORDER_PREFIXES = {
+    message_type: b'{"type":"%s","data":' % message_type.encode()
+    for message_type in ("order_item", "order_updated", "order_batch")
+}
+
+# Envelopes for status and error messages, which only vary in their text
+STATUS_PREFIX = b'{"type":"status","message":'
+ERROR_PREFIX = b'{"type":"error","message":'
+
+# Most orders the stream packs into a single order_batch message
+MAX_STREAM_BATCH = 128
+
+# Generated orders a stream buffers before the generator waits for the client
+MAX_STREAM_QUEUE = 256
+
+# Open orders a generator keeps for updates; the oldest are dropped beyond this
+MAX_REGISTRY = 10_000
+
+# Most queued messages a WebSocketWriter sends together in one frame
+MAX_FRAME_MESSAGES = 64
+
+# Orders generated between event loop yields when streaming with no delay
+BURST_YIELD_INTERVAL = 64
+
+# Values orders are drawn from; tuples shared by every generator instance
+CUSTOMER_NAMES = (
+    "John Smith",
+    "Sarah Johnson",
+    "Michael Brown",
+    "Emily Davis",
+    "David Wilson",
+    "Lisa Anderson",
+    "Robert Taylor",
+    "Jessica Martinez",
+    "Christopher Lee",
+    "Amanda Thompson",
+)
+PRIORITIES = ("Low", "Medium", "High", "Critical")
+PRODUCTS = (
+    "Electronics Bundle",
+    "Home Appliances",
+    "Books & Stationery",
+    "Clothing & Accessories",
+    "Sports Equipment",
+    "Kitchen Essentials",
+    "Garden Tools",
+    "Office Supplies",
+    "Health & Beauty",
+    "Automotive Parts",
+)
+
+
+# Date and time part of the last iso_now() result, keyed by its epoch second
+_iso_second = -1
+_iso_prefix = ""
+
+
+def iso_now() -> str:
+    """
+    Return the current local time in ISO 8601 format with microseconds.
+
+    The date and time up to the second are only formatted once per second;
+    calls within the same second just append the microseconds.
+
+    :return: Timestamp string such as ``2024-11-15T10:23:45.123456``
+    """
+    global _iso_second, _iso_prefix
+    second, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+    if second != _iso_second:
+        _iso_prefix = datetime.fromtimestamp(second).strftime("%Y-%m-%dT%H:%M:%S.")
+        _iso_second = second
+    return f"{_iso_prefix}{nanoseconds // 1000:06d}"
+
 
-@dataclass
+@dataclass(slots=True)
 class OrderData:
     """
     Data structure for order information.
@@ -71,21 +155,8 @@ class AsyncOrderDataGenerator:
         """
         self.order_counter = 0
         self.initial_status = initial_status
-        self.orders_registry: Dict[str, OrderData] = {}
-        self.customer_names = [
-            "John Smith",
-            "Sarah Johnson",
-            "Michael Brown",
-            "Emily Davis",
-            "David Wilson",
-            "Lisa Anderson",
-            "Robert Taylor",
-            "Jessica Martinez",
-            "Christopher Lee",
-            "Amanda Thompson",
-        ]
-        self.statuses = ["Pending", "Processing", "Shipped", "Delivered", "Cancelled"]
-        self.priorities = ["Low", "Medium", "High", "Critical"]
+        # Oldest first, so eviction can pop from the front
+        self.orders_registry: OrderedDict[str, OrderData] = OrderedDict()
 
     async def generate_order_items(
         self,
@@ -99,38 +170,66 @@ class AsyncOrderDataGenerator:
         :param max_orders: Maximum number of orders to generate
         :yields: OrderData object containing order information
         """
-        while self.order_counter < max_orders:
-            self.order_counter += 1
-
-            # Generate order details
-            order_id = f"ORD-{self.order_counter:05d}"
-            customer_name = random.choice(self.customer_names)
-            status = self.initial_status  # Use consistent initial status instead of random
-            priority = random.choice(self.priorities)
+        # Orders are due at fixed points in time, so time spent generating,
+        # sending or waiting for the consumer does not add to the interval
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        generated = 0
 
+        while self.order_counter < max_orders:
             # Generate order value between $10-$2500
-            order_value = round(random.uniform(10.0, 2500.0), 2)
-
-            # Create realistic details based on status
-            details = f"${order_value} - {self._generate_order_description()}"
-
-            order_data = OrderData(
-                id=str(uuid.uuid4()),
-                order_id=order_id,
-                customer_name=customer_name,
-                status=status,
-                priority=priority,
-                details=details,
-                timestamp=datetime.now().isoformat(),
-                order_value=order_value,
-                processed_at=None,
+            order_data = self._make_order(
+                random.choice(CUSTOMER_NAMES),
+                random.choice(PRIORITIES),
+                round(random.uniform(10.0, 2500.0), 2),
+                self._generate_order_description(),
             )
 
             # Store order in registry for later updates
-            self.orders_registry[order_id] = order_data
+            self.orders_registry[order_data.order_id] = order_data
+            self._trim_registry()
 
             yield order_data
-            await asyncio.sleep(frequency)
+            generated += 1
+
+            if frequency <= 0:
+                # Burst mode: only yield to the event loop now and then so the
+                # writer and incoming commands still get a turn
+                if generated % BURST_YIELD_INTERVAL == 0:
+                    await asyncio.sleep(0)
+            else:
+                deadline += frequency
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+    def _make_order(
+        self,
+        customer_name: str,
+        priority: str,
+        order_value: float,
+        product: str,
+    ) -> OrderData:
+        """
+        Create the next order from already drawn values. The order is not added
+        to the registry.
+
+        :param customer_name: Name of the customer
+        :param priority: Order priority level
+        :param order_value: Monetary value of the order
+        :param product: Product description used in the order details
+        :return: A new OrderData object in the initial status
+        """
+        self.order_counter += 1
+        return OrderData(
+            id=uuid.uuid4().hex,
+            order_id=f"ORD-{self.order_counter:05d}",
+            customer_name=customer_name,
+            status=self.initial_status,  # Use consistent initial status instead of random
+            priority=priority,
+            details=f"${order_value} - {product}",
+            timestamp=iso_now(),
+            order_value=order_value,
+            processed_at=None,
+        )
 
     def process_order(self, order_id: str) -> Optional[OrderData]:
         """
@@ -139,18 +238,14 @@ class AsyncOrderDataGenerator:
         :param order_id: The ID of the order to process
         :returns: Updated OrderData object if order exists and can be processed, None otherwise
         """
-        if order_id not in self.orders_registry:
-            return None
-
-        order = self.orders_registry[order_id]
-
-        # Only process orders that are in 'Pending' status
-        if order.status != "Pending":
+        # Only process orders that exist and are in 'Pending' status
+        order = self.orders_registry.get(order_id)
+        if order is None or order.status != "Pending":
             return None
 
         # Update order status and add processing timestamp
         order.status = "Processing"
-        order.processed_at = datetime.now().isoformat()
+        order.processed_at = iso_now()
 
         return order
 
@@ -161,20 +256,25 @@ class AsyncOrderDataGenerator:
         :param order_id: The ID of the order to close
         :returns: Updated OrderData object if order exists and can be closed, None otherwise
         """
-        if order_id not in self.orders_registry:
+        # Only close orders that exist and are in 'Processing' status
+        order = self.orders_registry.get(order_id)
+        if order is None or order.status != "Processing":
             return None
 
-        order = self.orders_registry[order_id]
-
-        # Only close orders that are in 'Processing' status
-        if order.status != "Processing":
-            return None
-
-        # Update order status to Done
+        # Update order status to Done; closed orders take no further updates
         order.status = "Done"
+        del self.orders_registry[order_id]
 
         return order
 
+    def _trim_registry(self) -> None:
+        """
+        Drop the oldest orders until the registry holds at most MAX_REGISTRY orders.
+        """
+        registry = self.orders_registry
+        while len(registry) > MAX_REGISTRY:
+            registry.popitem(last=False)
+
     def get_order(self, order_id: str) -> Optional[OrderData]:
         """
         Get order data by order ID.
@@ -190,38 +290,269 @@ class AsyncOrderDataGenerator:
 
         :return: A realistic order description string
         """
-        products = [
-            "Electronics Bundle",
-            "Home Appliances",
-            "Books & Stationery",
-            "Clothing & Accessories",
-            "Sports Equipment",
-            "Kitchen Essentials",
-            "Garden Tools",
-            "Office Supplies",
-            "Health & Beauty",
-            "Automotive Parts",
-        ]
-        return random.choice(products)
+        return random.choice(PRODUCTS)
+
+
+class WebSocketWriter:
+    """
+    Single writer for all outgoing messages of one WebSocket connection.
+
+    Handlers queue encoded messages with send() instead of writing to the socket
+    themselves, so a slow client does not hold up command handling. The writer
+    task sends every message that is ready as one frame, built by the
+    connection's codec. Messages passed to a single send() call always share
+    a frame.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        codec: Union[JsonCodec, MsgpackCodec],
+        max_pending: int = 1024,
+    ) -> None:
+        """
+        Initialize the writer.
+
+        :param websocket: WebSocket connection to write to
+        :param codec: Codec the connection's messages are encoded with
+        :param max_pending: Number of queued send() calls after which send() waits
+        """
+        self.websocket = websocket
+        self.codec = codec
+        self.max_pending = max_pending
+        # There is only one consumer, so a deque and a single future do the job of
+        # an asyncio.Queue without its getter bookkeeping on every put and get.
+        # Blocked senders still get a future each, so cancelling one of them
+        # cannot cancel the others.
+        self.pending: Deque[Tuple[bytes, ...]] = deque()
+        self.ready: Optional[asyncio.Future[None]] = None
+        self.putters: Deque[asyncio.Future[None]] = deque()
+        # Why run() stopped; once set, send() fails instead of queueing
+        self.error: Optional[BaseException] = None
+
+    async def send(self, *messages: bytes) -> None:
+        """
+        Queue encoded messages for sending in the same frame.
+
+        Returns immediately unless the queue is full, i.e. the client is not
+        keeping up.
+
+        :param messages: Messages encoded by the writer's codec
+        :raises RuntimeError: If the writer has stopped, e.g. because the client went away
+        """
+        while True:
+            if self.error is not None:
+                raise RuntimeError("WebSocket writer has stopped") from self.error
+            if len(self.pending) < self.max_pending:
+                break
+
+            putter = asyncio.get_running_loop().create_future()
+            self.putters.append(putter)
+            try:
+                await putter
+            except BaseException:
+                putter.cancel()
+                try:
+                    self.putters.remove(putter)
+                except ValueError:
+                    # Already woken; hand the free slot to the next sender
+                    self._wake_putters()
+                raise
+
+        self.pending.append(messages)
+        if self.ready is not None and not self.ready.done():
+            self.ready.set_result(None)
+
+    async def run(self) -> None:
+        """
+        Send queued messages until cancelled or a send fails.
+
+        A failed send is reported here rather than raised, since nothing awaits
+        the writer task; senders find out through send().
+        """
+        loop = asyncio.get_running_loop()
+        pending = self.pending
+        try:
+            while True:
+                if not pending:
+                    self.ready = loop.create_future()
+                    await self.ready
+
+                messages = list(pending.popleft())
+                while len(messages) < MAX_FRAME_MESSAGES and pending:
+                    messages.extend(pending.popleft())
+
+                self._wake_putters()
+
+                await self.websocket.send_bytes(self.codec.frame(messages))
+        except Exception as e:
+            print(f"WebSocket writer stopped: {e}")
+            self.error = e
+        except asyncio.CancelledError as e:
+            self.error = e
+            raise
+        finally:
+            # Wake blocked senders so they see the error instead of waiting forever
+            while self.putters:
+                putter = self.putters.popleft()
+                if not putter.done():
+                    putter.set_result(None)
+
+    def _wake_putters(self) -> None:
+        """
+        Wake as many blocked senders as there are free slots in the buffer.
+        """
+        free = self.max_pending - len(self.pending)
+        while free > 0 and self.putters:
+            putter = self.putters.popleft()
+            if not putter.done():
+                putter.set_result(None)
+                free -= 1
+
+
+class JsonCodec:
+    """
+    Encodes outgoing messages as JSON, the format the dashboard uses.
+
+    Messages are spliced into precomputed envelopes, so only the variable part
+    of each message goes through the serializer.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the codec and serialize its fixed messages.
+        """
+        # A long-lived encoder avoids the per-call setup of msgspec.json.encode()
+        self.encoder = msgspec.json.Encoder()
+        self.stream_stopped = self.status("Order processing stream stopped")
+        self.settings_updated = self.status("Settings updated")
+
+    def order(self, message_type: str, data: Union[OrderData, List[OrderData]]) -> bytes:
+        """
+        Build an order message.
+
+        :param message_type: One of order_item, order_updated or order_batch
+        :param data: Order, or list of orders, to embed as the message data
+        :return: Encoded message
+        """
+        # msgspec serializes dataclasses natively, no asdict() deep copy needed
+        return ORDER_PREFIXES[message_type] + self.encoder.encode(data) + b"}"
+
+    def status(self, message: str) -> bytes:
+        """
+        Build a status message.
+
+        :param message: Status text to show the user
+        :return: Encoded message
+        """
+        return STATUS_PREFIX + self.encoder.encode(message) + b"}"
+
+    def error(self, message: str) -> bytes:
+        """
+        Build an error message.
+
+        :param message: Error text to show the user
+        :return: Encoded message
+        """
+        return ERROR_PREFIX + self.encoder.encode(message) + b"}"
+
+    def frame(self, messages: List[bytes]) -> bytes:
+        """
+        Combine encoded messages into one frame payload.
+
+        :param messages: Encoded messages, at least one
+        :return: The lone message as is, or a JSON array of all messages
+        """
+        if len(messages) == 1:
+            return messages[0]
+        return b"[" + b",".join(messages) + b"]"
+
+
+class MsgpackCodec:
+    """
+    Encodes outgoing messages as MessagePack for clients that ask for it with
+    ``?format=msgpack``. Messages have the same shape as their JSON
+    counterparts but are smaller and cheaper to encode.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the codec and serialize its fixed messages.
+        """
+        self.encoder = msgspec.msgpack.Encoder()
+        self.stream_stopped = self.status("Order processing stream stopped")
+        self.settings_updated = self.status("Settings updated")
+
+    def order(self, message_type: str, data: Union[OrderData, List[OrderData]]) -> bytes:
+        """
+        Build an order message.
+
+        :param message_type: One of order_item, order_updated or order_batch
+        :param data: Order, or list of orders, to embed as the message data
+        :return: Encoded message
+        """
+        return self.encoder.encode({"type": message_type, "data": data})
+
+    def status(self, message: str) -> bytes:
+        """
+        Build a status message.
+
+        :param message: Status text to show the user
+        :return: Encoded message
+        """
+        return self.encoder.encode({"type": "status", "message": message})
+
+    def error(self, message: str) -> bytes:
+        """
+        Build an error message.
+
+        :param message: Error text to show the user
+        :return: Encoded message
+        """
+        return self.encoder.encode({"type": "error", "message": message})
+
+    def frame(self, messages: List[bytes]) -> bytes:
+        """
+        Combine encoded messages into one frame payload.
+
+        :param messages: Encoded messages, at least one
+        :return: The lone message as is, or a MessagePack array of all messages
+        """
+        count = len(messages)
+        if count == 1:
+            return messages[0]
+        # A MessagePack array is its length header followed by the encoded items
+        if count < 16:
+            header = bytes((0x90 | count,))
+        elif count < 1 << 16:
+            header = b"\xdc" + count.to_bytes(2, "big")
+        else:
+            header = b"\xdd" + count.to_bytes(4, "big")
+        return header + b"".join(messages)
+
+
+# Inbound commands are JSON whatever format the connection sends in
+COMMAND_DECODER = msgspec.json.Decoder()
+
+# Codecs by the value of the connection's format query parameter
+CODECS: Dict[str, Union[JsonCodec, MsgpackCodec]] = {
+    "json": JsonCodec(),
+    "msgpack": MsgpackCodec(),
+}
 
 
 @app.get("/", response_class=HTMLResponse)
-async def get_homepage(request: Request) -> HTMLResponse:
+async def get_homepage(request: Request) -> Response:
     """
     Serve the main order processing dashboard page.
 
     :param request: FastAPI request object
-    :return: HTML response containing the order processing interface
+    :return: HTML response containing the order processing interface,
+        or an empty 304 response if the browser's copy is current
     """
-    import time
-    cache_buster = str(int(time.time()))
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "cache_buster": cache_buster
-        }
-    )
+    if request.headers.get("if-none-match") == HOMEPAGE_ETAG:
+        return Response(status_code=304, headers=HOMEPAGE_CACHE_HEADERS)
+    return HTMLResponse(content=HOMEPAGE_HTML, headers=HOMEPAGE_HEADERS)
 
 
 @app.websocket("/ws")
@@ -230,21 +561,37 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
     WebSocket endpoint for real-time order processing communication.
 
     Handles WebSocket connections and processes real-time order generation,
-    batch operations, and other order management commands.
+    batch operations, and other order management commands. Commands are always
+    JSON; outgoing messages are JSON unless the client connects with
+    ``?format=msgpack``. Other formats are closed with code 1003.
 
     :param websocket: WebSocket connection object
     """
     await websocket.accept()
+
+    codec = CODECS.get(websocket.query_params.get("format", "json"))
+    if codec is None:
+        # Accepted first so the client actually sees 1003 (unsupported data);
+        # closing before the handshake is sent as a plain HTTP 403
+        await websocket.close(code=1003, reason="Unsupported format")
+        return
+
     print(f"WebSocket connection established: {websocket.client}")
 
+    writer = WebSocketWriter(websocket, codec)
+    writer_task = asyncio.create_task(writer.run())
     generator = AsyncOrderDataGenerator()
     current_stream_task = None
 
     try:
         while True:
             # Wait for messages from client
-            message = await websocket.receive_text()
-            data = json.loads(message)
+            # The browser sends text frames, so take whichever payload the frame has
+            # and parse it without decoding it to str first
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            data = COMMAND_DECODER.decode(message.get("bytes") or message.get("text") or b"")
             command = data.get("command")
 
             if command == "start_stream":
@@ -255,16 +602,11 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
                 max_orders = data.get("max_orders", 500)
 
                 current_stream_task = asyncio.create_task(
-                    stream_order_data(websocket, generator, frequency, max_orders)
+                    stream_order_data(writer, generator, frequency, max_orders)
                 )
 
-                await websocket.send_text(
-                    json.dumps(
-                        {
-                            "type": "status",
-                            "message": f"Started order processing stream (frequency: {frequency}s, max: {max_orders})",
-                        }
-                    )
+                await writer.send(
+                    codec.status(f"Started order processing stream (frequency: {frequency}s, max: {max_orders})")
                 )
 
             elif command == "stop_stream":
@@ -272,99 +614,47 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
                     current_stream_task.cancel()
                     current_stream_task = None
 
-                await websocket.send_text(
-                    json.dumps({"type": "status", "message": "Order processing stream stopped"})
-                )
+                await writer.send(codec.stream_stopped)
 
             elif command == "generate_batch":
                 count = data.get("count", 20)
-                await generate_batch_orders(websocket, generator, count)
+                await generate_batch_orders(writer, generator, count)
 
             elif command == "process_order":
                 order_id = data.get("order_id")
                 if order_id:
                     updated_order = generator.process_order(order_id)
                     if updated_order:
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "order_updated",
-                                    "data": asdict(updated_order),
-                                }
-                            )
-                        )
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "status",
-                                    "message": f"Order {order_id} has been processed",
-                                }
-                            )
+                        await writer.send(
+                            codec.order("order_updated", updated_order),
+                            codec.status(f"Order {order_id} has been processed"),
                         )
                     else:
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "error",
-                                    "message": f"Cannot process order {order_id}. Order not found or not in pending status.",
-                                }
-                            )
+                        await writer.send(
+                            codec.error(f"Cannot process order {order_id}. Order not found or not in pending status.")
                         )
                 else:
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "error",
-                                "message": "Order ID is required for processing"
-                            }
-                        )
-                    )
+                    await writer.send(codec.error("Order ID is required for processing"))
 
             elif command == "close_order":
                 order_id = data.get("order_id")
                 if order_id:
                     updated_order = generator.close_order(order_id)
                     if updated_order:
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "order_updated",
-                                    "data": asdict(updated_order),
-                                }
-                            )
-                        )
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "status",
-                                    "message": f"Order {order_id} has been closed",
-                                }
-                            )
+                        await writer.send(
+                            codec.order("order_updated", updated_order),
+                            codec.status(f"Order {order_id} has been closed"),
                         )
                     else:
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "error",
-                                    "message": f"Cannot close order {order_id}. Order not found or not in processing status.",
-                                }
-                            )
+                        await writer.send(
+                            codec.error(f"Cannot close order {order_id}. Order not found or not in processing status.")
                         )
                 else:
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "error",
-                                "message": "Order ID is required for closing"
-                            }
-                        )
-                    )
+                    await writer.send(codec.error("Order ID is required for closing"))
 
             elif command == "change_settings":
                 # Handle settings changes
-                await websocket.send_text(
-                    json.dumps({"type": "status", "message": "Settings updated"})
-                )
+                await writer.send(codec.settings_updated)
 
     except WebSocketDisconnect:
         print("WebSocket disconnected")
@@ -373,11 +663,36 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
     finally:
         if current_stream_task:
             current_stream_task.cancel()
+        writer_task.cancel()
         print("WebSocket connection closed")
 
 
+async def produce_orders(
+    generator: AsyncOrderDataGenerator,
+    frequency: float,
+    max_orders: int,
+    queue: asyncio.Queue[Optional[OrderData]],
+) -> None:
+    """
+    Feed generated orders into a queue for stream_order_data to send.
+
+    :param generator: Order data generator instance
+    :param frequency: Time interval between order generations in seconds
+    :param max_orders: Maximum number of orders to generate
+    :param queue: Queue receiving the orders, followed by None once generation ends
+    """
+    try:
+        async for order_item in generator.generate_order_items(frequency, max_orders):
+            # Waits while the queue is full, so a slow client throttles generation
+            await queue.put(order_item)
+    finally:
+        # When cancelled, the consumer has stopped and no longer reads the queue
+        if not asyncio.current_task().cancelling():
+            await queue.put(None)
+
+
 async def stream_order_data(
-    websocket: WebSocket,
+    writer: WebSocketWriter,
     generator: AsyncOrderDataGenerator,
     frequency: float,
     max_orders: int
@@ -385,108 +700,108 @@ async def stream_order_data(
     """
     Stream order data to connected WebSocket clients.
 
-    :param websocket: WebSocket connection object
+    :param writer: Writer for the client's WebSocket connection
     :param generator: Order data generator instance
     :param frequency: Time interval between order generations in seconds
     :param max_orders: Maximum number of orders to generate
     """
+    codec = writer.codec
+    queue: asyncio.Queue[Optional[OrderData]] = asyncio.Queue(maxsize=MAX_STREAM_QUEUE)
+    producer = asyncio.create_task(produce_orders(generator, frequency, max_orders, queue))
+
     try:
-        async for order_item in generator.generate_order_items(frequency, max_orders):
-            await websocket.send_text(
-                json.dumps(
-                    {
-                        "type": "order_item",
-                        "data": asdict(order_item),
-                    }
-                )
-            )
+        while True:
+            orders = [await queue.get()]
+
+            # Orders generated while the last send was in flight go out together
+            while len(orders) < MAX_STREAM_BATCH and not queue.empty():
+                orders.append(queue.get_nowait())
+
+            finished = orders[-1] is None
+            if finished:
+                orders.pop()
+
+            if len(orders) == 1:
+                await writer.send(codec.order("order_item", orders[0]))
+            elif orders:
+                await writer.send(codec.order("order_batch", orders))
+
+            if finished:
+                # Re-raises any error from the generator
+                await producer
+                break
 
     except asyncio.CancelledError:
         print("Order streaming cancelled")
         raise
     except Exception as e:
         print(f"Error in order streaming: {e}")
-        await websocket.send_text(
-            json.dumps(
-                {
-                    "type": "error",
-                    "message": f"Error generating order data: {str(e)}",
-                }
-            )
-        )
+        if writer.error is None:
+            await writer.send(codec.error(f"Error generating order data: {str(e)}"))
+    finally:
+        producer.cancel()
 
 
 async def generate_batch_orders(
-    websocket: WebSocket,
+    writer: WebSocketWriter,
     generator: AsyncOrderDataGenerator,
     count: int
 ) -> None:
     """
-    Generate a batch of orders and send them immediately.
+    Generate a batch of orders and send them immediately as one order_batch message.
 
-    :param websocket: WebSocket connection object
+    :param writer: Writer for the client's WebSocket connection
     :param generator: Order data generator instance
     :param count: Number of orders to generate in the batch
     """
+    codec = writer.codec
     try:
+        # Draw the random fields for the whole batch up front
+        customer_names = random.choices(CUSTOMER_NAMES, k=count)
+        priorities = random.choices(PRIORITIES, k=count)
+        products = random.choices(PRODUCTS, k=count)
+        order_values = [round(random.uniform(10.0, 2500.0), 2) for _ in range(count)]
+
         # Generate batch items by directly creating orders without using the async generator
-        for _ in range(count):
-            # Create order directly without the async generator limitations
-            generator.order_counter += 1
-
-            order_id = f"ORD-{generator.order_counter:05d}"
-            customer_name = random.choice(generator.customer_names)
-            status = generator.initial_status
-            priority = random.choice(generator.priorities)
-            order_value = round(random.uniform(10.0, 2500.0), 2)
-            details = f"${order_value} - {generator._generate_order_description()}"
-
-            order_data = OrderData(
-                id=str(uuid.uuid4()),
-                order_id=order_id,
-                customer_name=customer_name,
-                status=status,
-                priority=priority,
-                details=details,
-                timestamp=datetime.now().isoformat(),
-                order_value=order_value,
-                processed_at=None,
+        orders = [
+            generator._make_order(customer_name, priority, order_value, product)
+            for customer_name, priority, order_value, product in zip(
+                customer_names, priorities, order_values, products
             )
+        ]
 
-            # Store order in registry for later updates
-            generator.orders_registry[order_id] = order_data
-
-            await websocket.send_text(
-                json.dumps(
-                    {
-                        "type": "order_item",
-                        "data": asdict(order_data),
-                    }
-                )
-            )
+        # Store orders in registry for later updates
+        generator.orders_registry.update({order.order_id: order for order in orders})
+        generator._trim_registry()
 
-        await websocket.send_text(
-            json.dumps(
-                {
-                    "type": "status",
-                    "message": f"Generated batch of {count} orders",
-                }
-            )
+        # The whole batch and its status go out in a single frame
+        await writer.send(
+            codec.order("order_batch", orders),
+            codec.status(f"Generated batch of {count} orders"),
         )
 
     except Exception as e:
         print(f"Error generating batch orders: {e}")
-        await websocket.send_text(
-            json.dumps(
-                {
-                    "type": "error",
-                    "message": f"Error generating batch orders: {str(e)}",
-                }
-            )
-        )
+        await writer.send(codec.error(f"Error generating batch orders: {str(e)}"))
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Each connection owns its generator, so connections can be spread
+    # across worker processes. httptools and websockets ship with
+    # uvicorn[standard], so pin them; uvloop does too, but not on Windows or
+    # PyPy, so "auto" picks it only where it is installed
+    uvicorn.run(
+        "fastapi_generator_demo:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="auto",
+        http="httptools",
+        ws="websockets",
+        # Frames are small JSON messages; compressing them costs more CPU than it saves
+        ws_per_message_deflate=False,
+        access_log=False,
+    )
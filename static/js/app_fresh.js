@@ -9,13 +9,17 @@ class OrderProcessingApp {
     constructor() {
         console.log('🚀 Initializing OrderProcessingApp - Fresh Instance');
         this.ws = null;
+        this.decoder = new TextDecoder();
         this.orders = new Map();
         this.ordersArray = [];
         this.selectedOrders = new Set();
+        this.statusCounts = {}; // Running order count per status
         this.isConnected = false;
         this.currentPage = 1;
         this.pageSize = 25;
         this.maxOrders = 500; // Track max orders limit
+        this.tableBody = document.getElementById('ordersTableBody');
+        this.updateScheduled = false; // A display refresh is waiting for the next frame
         this.init();
     }
 
@@ -79,6 +83,8 @@ class OrderProcessingApp {
         console.log('🌐 Current location:', window.location.href);
 
         this.ws = new WebSocket(wsUrl);
+        // Server sends JSON as binary frames; decode them ourselves
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
             this.isConnected = true;
@@ -87,9 +93,16 @@ class OrderProcessingApp {
         };
 
         this.ws.onmessage = (event) => {
-            console.log('📨 Received WebSocket message:', event.data);
-            const message = JSON.parse(event.data);
-            this.handleMessage(message);
+            const text = typeof event.data === 'string' ?
+                event.data : this.decoder.decode(event.data);
+            console.log('📨 Received WebSocket message:', text);
+            const message = JSON.parse(text);
+            // The server sends messages that were ready together as one array
+            if (Array.isArray(message)) {
+                message.forEach(m => this.handleMessage(m));
+            } else {
+                this.handleMessage(message);
+            }
         };
 
         this.ws.onclose = (event) => {
@@ -120,6 +133,9 @@ class OrderProcessingApp {
             case 'order_item':
                 this.addOrderToTable(message.data);
                 break;
+            case 'order_batch':
+                this.addOrdersToTable(message.data);
+                break;
             case 'status':
                 this.showStatus(message.message, 'success');
                 break;
@@ -480,19 +496,54 @@ class OrderProcessingApp {
      * :param order: Order data object
      */
     addOrderToTable(order) {
-        this.orders.set(order.order_id, order);
-
-        // Sort orders by timestamp (newest first)
-        this.ordersArray = Array.from(this.orders.values()).sort((a, b) =>
-            new Date(b.timestamp) - new Date(a.timestamp)
-        );
+        const previous = this.insertOrder(order);
 
         // Enforce max orders limit - remove oldest orders if we exceed the limit
         this.enforceMaxOrdersLimit();
 
+        // A replaced order (e.g. ids restarting after a reconnect) may have
+        // moved, so redraw the page; otherwise insert just the new row
+        if (previous) {
+            this.renderCurrentPage();
+        } else {
+            this.renderInsertedOrder(order);
+        }
+        this.scheduleUpdate();
+    }
+
+    /**
+     * Add a batch of orders to the table, redrawing the page once
+     *
+     * :param orders: Array of order data objects
+     */
+    addOrdersToTable(orders) {
+        orders.forEach(order => this.insertOrder(order));
+        this.enforceMaxOrdersLimit();
+
         this.renderCurrentPage();
-        this.updatePaginationControls();
-        this.updateStatistics();
+        this.scheduleUpdate();
+    }
+
+    /**
+     * Track an order in the orders Map and the sorted ordersArray
+     *
+     * :param order: Order data object
+     * :returns: The order previously tracked under the same ID, if any
+     */
+    insertOrder(order) {
+        const previous = this.orders.get(order.order_id);
+        if (previous) {
+            this.countOrder(previous, -1);
+            this.orders.delete(order.order_id);
+            this.ordersArray.splice(this.ordersArray.indexOf(previous), 1);
+        }
+        this.countOrder(order, 1);
+        this.orders.set(order.order_id, order);
+
+        // Keep orders sorted by timestamp (newest first) without re-sorting
+        this.ordersArray.splice(this.findInsertIndex(order), 0, order);
+
+        return previous;
     }
 
     /**
@@ -501,19 +552,113 @@ class OrderProcessingApp {
      * :param order: Updated order data object
      */
     updateOrderInTable(order) {
+        // An update for an order we no longer track is added back like a new one
+        if (!this.orders.has(order.order_id)) {
+            this.addOrderToTable(order);
+            return;
+        }
+
+        this.countOrder(this.orders.get(order.order_id), -1);
+        this.countOrder(order, 1);
         this.orders.set(order.order_id, order);
 
-        // Sort orders by timestamp (newest first)
-        this.ordersArray = Array.from(this.orders.values()).sort((a, b) =>
-            new Date(b.timestamp) - new Date(a.timestamp)
-        );
+        // The timestamp never changes, so the order keeps its position
+        const index = this.ordersArray.findIndex(o => o.order_id === order.order_id);
+        this.ordersArray[index] = order;
 
-        // Enforce max orders limit after updates
-        this.enforceMaxOrdersLimit();
+        // Only the row for this order needs to be redrawn
+        const row = this.tableBody.querySelector(`tr[data-order-id="${order.order_id}"]`);
+        if (row) {
+            row.replaceWith(this.createOrderRow(order));
+        }
 
-        this.renderCurrentPage();
+        this.scheduleUpdate();
+    }
+
+    /**
+     * Refresh statistics, pagination and selection buttons on the next frame
+     *
+     * Messages can arrive faster than the screen refreshes; coalescing the
+     * summary updates keeps it to one refresh per frame however many orders
+     * came in.
+     */
+    scheduleUpdate() {
+        if (this.updateScheduled) return;
+
+        this.updateScheduled = true;
+        requestAnimationFrame(() => {
+            this.updateScheduled = false;
+            this.updateDisplay();
+        });
+    }
+
+    /**
+     * Refresh everything around the table that depends on the orders
+     */
+    updateDisplay() {
         this.updatePaginationControls();
         this.updateStatistics();
+        this.updateProcessSelectedButton();
+        this.updateCloseSelectedButton();
+        this.updateDeselectAllButton();
+    }
+
+    /**
+     * Insert the row for a newly added order into the current page
+     *
+     * Avoids rebuilding the whole page: at most one row is inserted and the
+     * rows pushed past the end of the page are removed.
+     *
+     * :param order: The order that was just added to ordersArray
+     */
+    renderInsertedOrder(order) {
+        const start = (this.currentPage - 1) * this.pageSize;
+        const visibleCount = Math.min(this.pageSize, this.ordersArray.length - start);
+
+        // The current page no longer exists (e.g. after trimming), redraw it
+        if (visibleCount <= 0) {
+            this.renderCurrentPage();
+            return;
+        }
+
+        const index = this.ordersArray.indexOf(order);
+        if (index !== -1 && index < start + this.pageSize) {
+            // An order on an earlier page shifts this page down by one row
+            const rowOrder = index < start ? this.ordersArray[start] : order;
+            const position = Math.max(index - start, 0);
+            const nextRow = this.tableBody.children[position] || null;
+            this.tableBody.insertBefore(this.createOrderRow(rowOrder), nextRow);
+        }
+
+        while (this.tableBody.childElementCount > visibleCount) {
+            this.tableBody.lastElementChild.remove();
+        }
+    }
+
+    /**
+     * Find where an order belongs in the newest-first ordersArray
+     *
+     * Binary search on the timestamp; orders with an equal timestamp keep
+     * their arrival order, as they did with the previous stable sort.
+     *
+     * :param order: Order data object
+     * :returns: Index to insert the order at
+     */
+    findInsertIndex(order) {
+        const time = Date.parse(order.timestamp);
+        let low = 0;
+        let high = this.ordersArray.length;
+
+        while (low < high) {
+            const mid = (low + high) >>> 1;
+            if (Date.parse(this.ordersArray[mid].timestamp) >= time) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+
+        return low;
     }
 
     /**
@@ -524,19 +669,14 @@ class OrderProcessingApp {
             // Calculate how many orders to remove
             const ordersToRemove = this.ordersArray.length - this.maxOrders;
 
-            // Get the oldest orders (they're at the end of the sorted array)
-            const oldestOrders = this.ordersArray.slice(-ordersToRemove);
-
-            // Remove oldest orders from both Map and selectedOrders Set
-            oldestOrders.forEach(order => {
+            // The oldest orders are at the end of the sorted array, drop them
+            // in place and remove them from both Map and selectedOrders Set
+            for (let i = 0; i < ordersToRemove; i++) {
+                const order = this.ordersArray.pop();
+                this.countOrder(order, -1);
                 this.orders.delete(order.order_id);
                 this.selectedOrders.delete(order.order_id);
-            });
-
-            // Update the ordersArray to reflect the changes
-            this.ordersArray = Array.from(this.orders.values()).sort((a, b) =>
-                new Date(b.timestamp) - new Date(a.timestamp)
-            );
+            }
 
             console.log(`🗑️ Removed ${ordersToRemove} oldest orders to maintain max limit of ${this.maxOrders}`);
         }
@@ -600,19 +740,20 @@ class OrderProcessingApp {
         return row;
     }
 
-    updateStatistics() {
-        const totalOrders = this.orders.size;
-        let pendingCount = 0;
-        let processingCount = 0;
-
-        this.orders.forEach(order => {
-            if (order.status === 'Pending') pendingCount++;
-            if (order.status === 'Processing') processingCount++;
-        });
+    /**
+     * Adjust the running per-status count for an order
+     *
+     * :param order: Order whose status is counted
+     * :param delta: 1 when the order is added, -1 when it is removed
+     */
+    countOrder(order, delta) {
+        this.statusCounts[order.status] = (this.statusCounts[order.status] || 0) + delta;
+    }
 
-        document.getElementById('totalOrders').textContent = totalOrders;
-        document.getElementById('pendingCount').textContent = pendingCount;
-        document.getElementById('processingCount').textContent = processingCount;
+    updateStatistics() {
+        document.getElementById('totalOrders').textContent = this.orders.size;
+        document.getElementById('pendingCount').textContent = this.statusCounts.Pending || 0;
+        document.getElementById('processingCount').textContent = this.statusCounts.Processing || 0;
     }
 
     updateConnectionStatus(status, statusClass) {
@@ -646,7 +787,7 @@ class OrderProcessingApp {
     }
 
     renderCurrentPage() {
-        const tableBody = document.getElementById('ordersTableBody');
+        const tableBody = this.tableBody;
         tableBody.innerHTML = '';
 
         const start = (this.currentPage - 1) * this.pageSize;
@@ -15,7 +15,10 @@ async def test_websocket_connection():
     
     try:
         print(f"Attempting to connect to {uri}")
-        async with websockets.connect(uri) as websocket:
+        # A sanity check needs neither compression nor keepalive pings
+        async with websockets.connect(
+            uri, compression=None, ping_interval=None, max_queue=1024
+        ) as websocket:
             print("✅ WebSocket connection successful!")
             
             # Send a test message
@@ -29,7 +32,8 @@ async def test_websocket_connection():
             
             # Wait for response
             print("Waiting for response...")
-            response = await asyncio.wait_for(websocket.recv(), timeout=5.0)
+            async with asyncio.timeout(5.0):
+                response = await websocket.recv()
             print(f"✅ Received response: {response}")
             
     except ConnectionRefusedError: